@@ -1,30 +1,73 @@
 """Foundational building blocks for the Groq-powered chat agent."""
 
+from typing import TYPE_CHECKING
+
 from .agent import (
     DEFAULT_GROQ_MODEL,
     GROQ_TEXT_MODELS,
     GroqConfig,
     GroqConversationAgent,
+    build_groq_client,
 )
 from .memory import ConversationMemory, Message
-from .plantuml_utils import (
-    PlantUMLDiagram,
-    PlantUMLRenderingError,
-    extract_plantuml_blocks,
-    render_plantuml_from_text,
-    save_diagrams,
+
+# Rendering helpers load on first access so chat-only callers skip their import cost.
+_PLANTUML_EXPORTS = frozenset(
+    {
+        "PlantUMLDiagram",
+        "PlantUMLRenderingError",
+        "extract_plantuml_blocks",
+        "render_plantuml",
+        "render_plantuml_blocks",
+        "render_plantuml_from_text",
+        "render_plantuml_from_text_async",
+        "render_plantuml_from_text_concurrent",
+        "save_diagrams",
+        "set_disk_cache_dir",
+    }
 )
 
+if TYPE_CHECKING:
+    from .plantuml_utils import (
+        PlantUMLDiagram,
+        PlantUMLRenderingError,
+        extract_plantuml_blocks,
+        render_plantuml,
+        render_plantuml_blocks,
+        render_plantuml_from_text,
+        render_plantuml_from_text_async,
+        render_plantuml_from_text_concurrent,
+        save_diagrams,
+        set_disk_cache_dir,
+    )
+
+
+def __getattr__(name: str) -> object:
+    if name in _PLANTUML_EXPORTS:
+        from . import plantuml_utils
+
+        value = getattr(plantuml_utils, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "GroqConversationAgent",
     "GroqConfig",
+    "build_groq_client",
     "ConversationMemory",
     "Message",
     "PlantUMLDiagram",
     "PlantUMLRenderingError",
     "extract_plantuml_blocks",
+    "render_plantuml",
+    "render_plantuml_blocks",
     "render_plantuml_from_text",
+    "render_plantuml_from_text_async",
+    "render_plantuml_from_text_concurrent",
     "save_diagrams",
+    "set_disk_cache_dir",
     "DEFAULT_GROQ_MODEL",
     "GROQ_TEXT_MODELS",
 ]
@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Iterable, Optional
+from functools import cached_property
+from typing import Iterable, Iterator, Optional, Sequence
 
-from .memory import ConversationMemory
+from .memory import ConversationMemory, Message
 from chatkey import get_groq_api_key
 
 try:
@@ -35,6 +38,102 @@ GROQ_TEXT_MODELS: tuple[str, ...] = (
 )
 DEFAULT_GROQ_MODEL: str = GROQ_TEXT_MODELS[0]
 
+# Cap for in-flight requests in respond_many so batches stay inside Groq's rate limits.
+_MAX_CONCURRENT_REQUESTS = 8
+_RESPONSE_CACHE_SIZE = 128
+
+_DEFAULT_SYSTEM_PROMPT = (
+    "Role: You are an expert system designer who creates and edits UML diagrams from user-"
+    "provided text or existing PlantUML. Communicate in simple, clear language matching the"
+    " user's language.\n\n"
+    "Primary Goal: Convert the user's input into correct PlantUML code for the requested UML"
+    " diagram(s), plus a short, friendly natural-language summary. If details are missing,"
+    " ask the minimum necessary follow-up questions; otherwise proceed with safe, minimal"
+    " assumptions and state them explicitly.\n\n"
+    "Supported Diagram Types: Class, Sequence, Use Case, Activity, State, Component,"
+    " Deployment, Package.\n\n"
+    "Rules:\n"
+    "- Only use the information in the user message and any explicitly provided artifacts"
+    " (e.g., existing PlantUML). Do not browse or invent facts.\n"
+    "- If the request is outside capabilities (e.g., rendering images, exporting files),"
+    " politely decline and offer PlantUML code instead.\n"
+    "- Ask follow-up questions only when needed to proceed; keep them short and actionable."
+    " If you can proceed with reasonable defaults, do so and list assumptions.\n"
+    "- Be precise, transparent, and accurate like a professional system designer.\n\n"
+    "Process:\n"
+    "1) Understand the request\n"
+    "   - Detect the user's language; respond in that language (default to English if unclear).\n"
+    "   - Determine whether to create a new diagram or edit an existing one.\n"
+    "   - Identify the intended UML diagram type(s). If unclear, ask the user to choose (Class,"
+    " Sequence, Use Case, Activity, State, Component, Deployment, Package).\n"
+    "   - Extract key facts: elements (classes/actors/components), attributes, operations,"
+    " relationships, multiplicities, message flow, states, transitions, etc.\n"
+    "2) Resolve gaps\n"
+    "   - If critical details are missing (e.g., which diagram type, main entities, or message"
+    " order), ask up to 1–2 concise follow-up questions.\n"
+    "   - Otherwise proceed with minimal, neutral assumptions; list them explicitly.\n"
+    "3) Produce the diagram\n"
+    "   - Write valid PlantUML bounded by @startuml and @enduml.\n"
+    "   - Use the correct syntax for the chosen diagram type(s).\n"
+    "   - Preserve and modify only the specified parts when editing existing PlantUML.\n"
+    "   - Do not invent types, attributes, methods, or multiplicities unless the user provided"
+    " them; if needed, keep them generic or omit.\n"
+    "4) Explain clearly\n"
+    "   - Provide a brief, friendly summary of what the diagram shows, in simple words.\n"
+    "   - Mention key elements and relationships and highlight any assumptions or open"
+    " questions.\n"
+    "5) Quality check\n"
+    "   - Ensure PlantUML syntax is consistent and likely to render.\n"
+    "   - Keep names consistent with the user's terminology."
+)
+
+_DEFAULT_OUTPUT_INSTRUCTIONS = (
+    "Output Format:\n"
+    "- Analysis (concise):\n"
+    "  - Facts extracted (bullets)\n"
+    "  - Assumptions (bullets, only if any)\n"
+    "- PlantUML:\n"
+    "  @startuml\n"
+    "  ...valid PlantUML for the chosen diagram type...\n"
+    "  @enduml\n"
+    "- Summary: 3–6 sentences in the user's language, simple and friendly.\n"
+    "- Follow-up (only if needed): 1–2 short, specific questions to resolve remaining ambiguity.\n\n"
+    "Editing Existing Diagrams:\n"
+    "- If the user provides PlantUML, apply the requested changes while preserving everything"
+    " else.\n"
+    "- Call out what changed in the summary.\n\n"
+    "Common Conventions (guidance, not mandatory):\n"
+    "- Class: classes with attributes and methods only if provided; use visibility markers if"
+    " specified (+, -, #); show relationships and multiplicities exactly as given.\n"
+    "- Sequence: declare participants; order messages as described; use activation/notes only"
+    " if explicitly requested.\n"
+    "- Use Case: show actors, use cases, and include/extend relationships if specified.\n"
+    "- Activity/State: include start/end, decisions/merges, transitions with guards only if"
+    " provided.\n\n"
+    "Example (format illustration):\n"
+    "User input: \"There is a User with id and name. A User creates many Orders. Order has"
+    " total.\"\n\n"
+    "Expected output:\n"
+    "- Analysis:\n"
+    "  - Facts: User(id, name), Order(total); User creates many Orders (1..*).\n"
+    "  - Assumptions: No methods specified; attribute types not provided, so omitted.\n"
+    "- PlantUML:\n"
+    "  @startuml\n"
+    "  class User {\n"
+    "    id\n"
+    "    name\n"
+    "  }\n"
+    "  class Order {\n"
+    "    total\n"
+    "  }\n"
+    "  User \"1\" -- \"*\" Order : creates\n"
+    "  @enduml\n"
+    "- Summary: A User has id and name. A User can create many Orders. Each Order has a total."
+    " I left out types and methods because they were not given.\n\n"
+    "If information is missing (e.g., diagram type), ask: \"Which UML diagram should I create:"
+    " Class, Sequence, Use Case, Activity, State, Component, Deployment, or Package?\""
+)
+
 
 @dataclass
 class GroqConfig:
@@ -45,10 +144,43 @@ class GroqConfig:
     max_tokens: Optional[int] = None
     timeout: Optional[float] = None
     max_retries: int = 2
+    # Replay earlier answers for an identical (history, input) pair instead of calling Groq.
+    # Only sensible for near-deterministic sampling, e.g. temperature <= 0.1.
+    cache_deterministic: bool = False
+
+
+def build_groq_client(config: GroqConfig) -> ChatGroq:
+    """Create the LangChain Groq chat model described by `config`.
+
+    Agents build one on demand; long-lived hosts can build it once and pass it to several
+    agents so they share the underlying HTTP connection pool.
+    """
+
+    if ChatGroq is None:  # pragma: no cover - optional dependency
+        raise ImportError(
+            "langchain-groq is required to use GroqConversationAgent."
+        )
+    api_key = get_groq_api_key()
+    os.environ.setdefault("GROQ_API_KEY", api_key)
+
+    return ChatGroq(
+        model=config.model,
+        temperature=config.temperature,
+        max_tokens=config.max_tokens,
+        timeout=config.timeout,
+        max_retries=config.max_retries,
+    )
 
 
 class GroqConversationAgent:
-    """Maintains chat history and interacts with Groq via LangChain."""
+    """Maintains chat history and interacts with Groq via LangChain.
+
+    The system message is built once and sent byte-identical on every turn so provider-side
+    prompt caching can reuse the prefix. Per-turn context belongs in the history (see
+    :meth:`inject_system_note`), never in the system message. ``update_system_prompt`` and
+    ``update_output_instructions`` rebuild it and invalidate that prefix for all later turns,
+    so call them sparingly.
+    """
 
     def __init__(
         self,
@@ -59,131 +191,67 @@ class GroqConversationAgent:
         config: GroqConfig | None = None,
         client: ChatGroq | None = None,
     ) -> None:
-        self.memory = memory or ConversationMemory()
-        self.system_prompt = system_prompt or (
-            "Role: You are an expert system designer who creates and edits UML diagrams from user-"
-            "provided text or existing PlantUML. Communicate in simple, clear language matching the"
-            " user's language.\n\n"
-            "Primary Goal: Convert the user's input into correct PlantUML code for the requested UML"
-            " diagram(s), plus a short, friendly natural-language summary. If details are missing,"
-            " ask the minimum necessary follow-up questions; otherwise proceed with safe, minimal"
-            " assumptions and state them explicitly.\n\n"
-            "Supported Diagram Types: Class, Sequence, Use Case, Activity, State, Component,"
-            " Deployment, Package.\n\n"
-            "Rules:\n"
-            "- Only use the information in the user message and any explicitly provided artifacts"
-            " (e.g., existing PlantUML). Do not browse or invent facts.\n"
-            "- If the request is outside capabilities (e.g., rendering images, exporting files),"
-            " politely decline and offer PlantUML code instead.\n"
-            "- Ask follow-up questions only when needed to proceed; keep them short and actionable."
-            " If you can proceed with reasonable defaults, do so and list assumptions.\n"
-            "- Be precise, transparent, and accurate like a professional system designer.\n\n"
-            "Process:\n"
-            "1) Understand the request\n"
-            "   - Detect the user's language; respond in that language (default to English if unclear).\n"
-            "   - Determine whether to create a new diagram or edit an existing one.\n"
-            "   - Identify the intended UML diagram type(s). If unclear, ask the user to choose (Class,"
-            " Sequence, Use Case, Activity, State, Component, Deployment, Package).\n"
-            "   - Extract key facts: elements (classes/actors/components), attributes, operations,"
-            " relationships, multiplicities, message flow, states, transitions, etc.\n"
-            "2) Resolve gaps\n"
-            "   - If critical details are missing (e.g., which diagram type, main entities, or message"
-            " order), ask up to 1–2 concise follow-up questions.\n"
-            "   - Otherwise proceed with minimal, neutral assumptions; list them explicitly.\n"
-            "3) Produce the diagram\n"
-            "   - Write valid PlantUML bounded by @startuml and @enduml.\n"
-            "   - Use the correct syntax for the chosen diagram type(s).\n"
-            "   - Preserve and modify only the specified parts when editing existing PlantUML.\n"
-            "   - Do not invent types, attributes, methods, or multiplicities unless the user provided"
-            " them; if needed, keep them generic or omit.\n"
-            "4) Explain clearly\n"
-            "   - Provide a brief, friendly summary of what the diagram shows, in simple words.\n"
-            "   - Mention key elements and relationships and highlight any assumptions or open"
-            " questions.\n"
-            "5) Quality check\n"
-            "   - Ensure PlantUML syntax is consistent and likely to render.\n"
-            "   - Keep names consistent with the user's terminology."
-        )
-        self.output_instructions = output_instructions or (
-            "Output Format:\n"
-            "- Analysis (concise):\n"
-            "  - Facts extracted (bullets)\n"
-            "  - Assumptions (bullets, only if any)\n"
-            "- PlantUML:\n"
-            "  @startuml\n"
-            "  ...valid PlantUML for the chosen diagram type...\n"
-            "  @enduml\n"
-            "- Summary: 3–6 sentences in the user's language, simple and friendly.\n"
-            "- Follow-up (only if needed): 1–2 short, specific questions to resolve remaining ambiguity.\n\n"
-            "Editing Existing Diagrams:\n"
-            "- If the user provides PlantUML, apply the requested changes while preserving everything"
-            " else.\n"
-            "- Call out what changed in the summary.\n\n"
-            "Common Conventions (guidance, not mandatory):\n"
-            "- Class: classes with attributes and methods only if provided; use visibility markers if"
-            " specified (+, -, #); show relationships and multiplicities exactly as given.\n"
-            "- Sequence: declare participants; order messages as described; use activation/notes only"
-            " if explicitly requested.\n"
-            "- Use Case: show actors, use cases, and include/extend relationships if specified.\n"
-            "- Activity/State: include start/end, decisions/merges, transitions with guards only if"
-            " provided.\n\n"
-            "Example (format illustration):\n"
-            "User input: \"There is a User with id and name. A User creates many Orders. Order has"
-            " total.\"\n\n"
-            "Expected output:\n"
-            "- Analysis:\n"
-            "  - Facts: User(id, name), Order(total); User creates many Orders (1..*).\n"
-            "  - Assumptions: No methods specified; attribute types not provided, so omitted.\n"
-            "- PlantUML:\n"
-            "  @startuml\n"
-            "  class User {\n"
-            "    id\n"
-            "    name\n"
-            "  }\n"
-            "  class Order {\n"
-            "    total\n"
-            "  }\n"
-            "  User \"1\" -- \"*\" Order : creates\n"
-            "  @enduml\n"
-            "- Summary: A User has id and name. A User can create many Orders. Each Order has a total."
-            " I left out types and methods because they were not given.\n\n"
-            "If information is missing (e.g., diagram type), ask: \"Which UML diagram should I create:"
-            " Class, Sequence, Use Case, Activity, State, Component, Deployment, or Package?\""
-        )
+        # An empty memory is falsy now that it has __len__, so test for None explicitly.
+        self.memory = memory if memory is not None else ConversationMemory()
+        self.system_prompt = system_prompt or _DEFAULT_SYSTEM_PROMPT
+        self.output_instructions = output_instructions or _DEFAULT_OUTPUT_INSTRUCTIONS
+        self._system_message: BaseMessage | None = None
+        self._response_cache: OrderedDict[tuple[object, ...], str] = OrderedDict()
         self.config = config or GroqConfig()
         self.client = client or self._build_client()
 
     def _build_client(self) -> ChatGroq:
-        if ChatGroq is None:  # pragma: no cover - optional dependency
-            raise ImportError(
-                "langchain-groq is required to use GroqConversationAgent."
-            )
-        api_key = get_groq_api_key()
-        os.environ.setdefault("GROQ_API_KEY", api_key)
-
-        return ChatGroq(
-            model=self.config.model,
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens,
-            timeout=self.config.timeout,
-            max_retries=self.config.max_retries,
-        )
+        return build_groq_client(self.config)
+
+    @property
+    def system_prompt(self) -> str:
+        return self._system_prompt
+
+    @system_prompt.setter
+    def system_prompt(self, value: str) -> None:
+        # Plain assignment must rebuild the cached system message just like update_system_prompt.
+        self._system_prompt = value
+        self._invalidate_system_cache()
+
+    @property
+    def output_instructions(self) -> str:
+        return self._output_instructions
+
+    @output_instructions.setter
+    def output_instructions(self, value: str) -> None:
+        self._output_instructions = value
+        self._invalidate_system_cache()
 
-    def _build_prompt(self) -> list[BaseMessage]:
-        history = self.memory.as_langchain()
+    @cached_property
+    def _system_text(self) -> str:
         # We merge the persona instructions with any dynamic formatting guidance
         # before passing them as a single system message.
-        system_text = self.system_prompt
         if self.output_instructions:
-            system_text = f"{system_text}\n\nOutput requirements:\n{self.output_instructions}"
+            return f"{self.system_prompt}\n\nOutput requirements:\n{self.output_instructions}"
+        return self.system_prompt
+
+    def _invalidate_system_cache(self) -> None:
+        self.__dict__.pop("_system_text", None)
+        self._system_message = None
+
+    def _build_prompt(self, memory: ConversationMemory | None = None) -> list[BaseMessage]:
+        history = (memory if memory is not None else self.memory).as_langchain()
         messages: list[BaseMessage] = []
         if SystemMessage is not None:
-            messages.append(SystemMessage(content=system_text))
+            # Built once and reused every turn; LangChain validates messages on construction.
+            if self._system_message is None:
+                self._system_message = SystemMessage(content=self._system_text)
+            messages.append(self._system_message)
         messages.extend(history)
         return messages
 
     def respond(self, user_input: str) -> str:
-        """Append the user message, invoke Groq, and store the reply."""
+        """Append the user message, query Groq, and store the reply."""
+
+        return "".join(self.respond_stream(user_input))
+
+    def respond_stream(self, user_input: str) -> Iterator[str]:
+        """Like :meth:`respond`, but yield the reply in chunks as Groq generates it."""
 
         user_input = user_input.strip()
         if not user_input:
@@ -191,20 +259,92 @@ class GroqConversationAgent:
 
         # Persist the turn so the LangChain client sees the full dialogue and
         # our local history stays consistent with the response.
+        cache_key = self._response_cache_key(user_input) if self.config.cache_deterministic else None
         self.memory.add_user_message(user_input)
-        prompt = self._build_prompt()
-        response = self.client.invoke(prompt)
-        content = getattr(response, "content", str(response))
-        self.memory.add_ai_message(content)
-        return content
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                self.memory.add_ai_message(cached)
+                return iter((cached,))
+        return self._stream_reply(self._build_prompt(), cache_key)
+
+    def _response_cache_key(self, user_input: str) -> tuple[object, ...]:
+        return (
+            self.memory.history(),
+            user_input,
+            self._system_text,
+            self.config.model,
+            self.config.temperature,
+        )
+
+    def _stream_reply(
+        self, prompt: list[BaseMessage], cache_key: tuple[object, ...] | None = None
+    ) -> Iterator[str]:
+        parts: list[str] = []
+        for chunk in self.client.stream(prompt):
+            content = getattr(chunk, "content", str(chunk))
+            if content:
+                parts.append(content)
+                yield content
+        # Store the reply only once the stream completes so history never holds partial answers.
+        reply = "".join(parts)
+        self.memory.add_ai_message(reply)
+        if cache_key is not None:
+            self._response_cache[cache_key] = reply
+            if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+
+    async def respond_many(
+        self,
+        user_inputs: Iterable[str],
+        *,
+        max_concurrency: int = _MAX_CONCURRENT_REQUESTS,
+    ) -> list[str]:
+        """Answer independent prompts concurrently, each against the current history.
+
+        Every prompt gets its own snapshot of the conversation and none of the replies are
+        stored, so concurrent calls cannot interleave turns in ``self.memory``.
+        """
+
+        prompts: list[list[BaseMessage]] = []
+        for user_input in user_inputs:
+            user_input = user_input.strip()
+            if not user_input:
+                raise ValueError("user_input must not be empty")
+            memory = ConversationMemory(max_messages=self.memory.max_messages)
+            memory.load_history(self.memory.history())
+            memory.add_user_message(user_input)
+            prompts.append(self._build_prompt(memory))
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def invoke(prompt: list[BaseMessage]) -> str:
+            async with semaphore:
+                response = await self.client.ainvoke(prompt)
+            return getattr(response, "content", str(response))
+
+        return list(await asyncio.gather(*(invoke(prompt) for prompt in prompts)))
 
     def inject_system_note(self, note: str) -> None:
-        """Append a system-level reminder into the rolling context."""
+        """Append a system-level reminder into the rolling context.
+
+        Notes go after the existing history rather than into the system message, which keeps
+        the cached prompt prefix intact.
+        """
 
         self.memory.add_system_message(note)
 
-    def history(self) -> list[str]:
-        return [f"{message.role}: {message.content}" for message in self.memory.history()]
+    def history(self) -> Iterator[str]:
+        """Yield ``"role: content"`` lines; wrap in ``list()`` when a list is needed."""
+
+        for message in self.memory.history():
+            yield f"{message.role}: {message.content}"
+
+    def history_raw(self) -> Sequence[Message]:
+        """Return the stored messages without formatting them; treat as read-only."""
+
+        return self.memory.history()
 
     def reset(self) -> None:
         self.memory.clear()
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Iterable, List
+from functools import cache
+from typing import Deque, Iterable, List, Tuple
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Message:
     """Container for chat messages."""
 
@@ -17,18 +19,57 @@ class Message:
         return Message(role=self.role, content=self.content.strip())
 
 
-@dataclass
+@cache
+def _message_classes() -> dict[str, type] | None:
+    try:
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return {"assistant": AIMessage, "user": HumanMessage, "system": SystemMessage}
+
+
+def _to_langchain(message: Message) -> object | None:
+    classes = _message_classes()
+    if classes is None:  # pragma: no cover - optional dependency
+        return None
+    message_class = classes.get(message.role)
+    if message_class is None:
+        return None
+    return message_class(content=message.content)
+
+
+@dataclass(slots=True)
 class ConversationMemory:
     """Stores chat history with an optional max size."""
 
     max_messages: int | None = 20
-    _messages: List[Message] = field(default_factory=list)
+    _messages: Deque[Message] = field(default_factory=deque)
+    # LangChain counterparts built once per message; None marks roles LangChain has no class for.
+    _converted: Deque[object | None] = field(default_factory=deque, init=False, repr=False, compare=False)
+    # Read-only snapshot handed out by history(); dropped whenever the messages change.
+    _snapshot: Tuple[Message, ...] | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Bounded deques drop the oldest turn in O(1), so the retention policy needs no trimming.
+        self._messages = deque(self._messages, maxlen=self.max_messages)
+        self._converted = deque(
+            (_to_langchain(message) for message in self._messages), maxlen=self.max_messages
+        )
+
+    def __setattr__(self, name: str, value: object) -> None:
+        object.__setattr__(self, name, value)
+        # Deque bounds are fixed when built, so a new limit re-wraps both buffers (keeping the
+        # newest turns). The hasattr check skips the assignment made during __init__.
+        if name == "max_messages" and hasattr(self, "_converted"):
+            object.__setattr__(self, "_messages", deque(self._messages, maxlen=value))
+            object.__setattr__(self, "_converted", deque(self._converted, maxlen=value))
+            object.__setattr__(self, "_snapshot", None)
 
     def add(self, role: str, content: str) -> None:
         message = Message(role=role, content=content.strip())
         self._messages.append(message)
-        # Enforce the retention policy immediately so every mutation stays within bounds.
-        self._trim()
+        self._converted.append(_to_langchain(message))
+        self._snapshot = None
 
     def add_user_message(self, content: str) -> None:
         self.add("user", content)
@@ -39,40 +80,36 @@ class ConversationMemory:
     def add_system_message(self, content: str) -> None:
         self.add("system", content)
 
-    def history(self) -> List[Message]:
-        return list(self._messages)
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    @property
+    def latest_index(self) -> int:
+        """Index of the newest message in :meth:`history`, or ``-1`` when empty."""
+
+        return len(self._messages) - 1
+
+    def history(self) -> Tuple[Message, ...]:
+        # Repeated calls between mutations share one tuple instead of copying the deque.
+        if self._snapshot is None:
+            self._snapshot = tuple(self._messages)
+        return self._snapshot
 
     def clear(self) -> None:
         self._messages.clear()
-
-    def _trim(self) -> None:
-        if self.max_messages is None:
-            return
-        overflow = len(self._messages) - self.max_messages
-        if overflow > 0:
-            # Drop the oldest turns, preserving chronological order for the remainder.
-            del self._messages[0:overflow]
+        self._converted.clear()
+        self._snapshot = None
 
     def as_langchain(self) -> List[object]:
         """Convert stored messages to LangChain message objects."""
 
-        try:
-            from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-        except ImportError as exc:  # pragma: no cover - optional dependency
-            raise ImportError(
-                "langchain-core is required to build LangChain messages"
-            ) from exc
-
-        converted: List[object] = []
-        for message in self._messages:
-            if message.role == "assistant":
-                converted.append(AIMessage(content=message.content))
-            elif message.role == "user":
-                converted.append(HumanMessage(content=message.content))
-            elif message.role == "system":
-                converted.append(SystemMessage(content=message.content))
-        return converted
+        if _message_classes() is None:  # pragma: no cover - optional dependency
+            raise ImportError("langchain-core is required to build LangChain messages")
+        return [message for message in self._converted if message is not None]
 
     def load_history(self, messages: Iterable[Message]) -> None:
-        self._messages = [message.trimmed() for message in messages]
-        self._trim()
+        self._messages = deque((message.trimmed() for message in messages), maxlen=self.max_messages)
+        self._converted = deque(
+            (_to_langchain(message) for message in self._messages), maxlen=self.max_messages
+        )
+        self._snapshot = None
@@ -2,21 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
 import os
 import re
-from dataclasses import dataclass
+import secrets
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Sequence
-from uuid import uuid4
 
 import requests
 from requests import RequestException
-
-try:  # pragma: no cover - optional dependency
-    from plantuml import PlantUML
-except ImportError:  # pragma: no cover - optional dependency
-    PlantUML = None  # type: ignore[misc,assignment]
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class PlantUMLRenderingError(RuntimeError):
@@ -35,15 +41,57 @@ class PlantUMLDiagram:
 
 
 _PLANTUML_PATTERN = re.compile(r"(?is)(@startuml.*?@enduml)")
+_START_MARKER = "@startuml"
+_END_MARKER = "@enduml"
 _DEFAULT_PNG_ENDPOINT = "https://www.plantuml.com/plantuml/png/"
 _DEFAULT_SVG_ENDPOINT = "https://www.plantuml.com/plantuml/svg/"
+# PlantUML's URL encoding is base64 over a different alphabet; padding becomes zero digits.
+_BASE64_TO_PLANTUML = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=",
+    b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_0",
+)
+_DOWNLOAD_TIMEOUT = 15
+_MAX_IO_WORKERS = 8
+_RENDER_CACHE_SIZE = 256
+_DISK_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Estimated bytes held by each cache directory, so writes need not re-scan it.
+_DISK_CACHE_USAGE: dict[Path, int] = {}
+_DISK_CACHE_LOCK = threading.Lock()
+# Set through set_disk_cache_dir(); takes precedence over PLANTUML_CACHE_DIR.
+_DISK_CACHE_DIR: Path | None = None
+_RENDER_CACHE: OrderedDict[bytes, PlantUMLDiagram] = OrderedDict()
+# Renders may run on worker threads; OrderedDict reordering/eviction is not atomic.
+_RENDER_CACHE_LOCK = threading.Lock()
 
 
 def extract_plantuml_blocks(text: str) -> List[str]:
     """Return PlantUML snippets found within the text."""
 
-    # The pattern captures each bounded @startuml…@enduml block including newlines.
-    return [match.group(1).strip() for match in _PLANTUML_PATTERN.finditer(text)]
+    return list(_extract_blocks(text))
+
+
+@lru_cache(maxsize=256)
+def _extract_blocks(text: str) -> tuple[str, ...]:
+    # Memoised on the raw reply, which reruns and retries hand back verbatim; the tuple keeps
+    # the cached value immutable while callers get a fresh list.
+
+    # Markers are matched case-insensitively; lowercasing only keeps offsets valid when it
+    # preserves length, so exotic Unicode input falls back to the regex.
+    haystack = text.lower()
+    if len(haystack) != len(text):
+        return tuple(match.group(1) for match in _PLANTUML_PATTERN.finditer(text))
+
+    # Two str.find scans per block keep extraction linear without regex backtracking.
+    blocks: List[str] = []
+    start = haystack.find(_START_MARKER)
+    while start != -1:
+        end = haystack.find(_END_MARKER, start + len(_START_MARKER))
+        if end == -1:
+            break
+        end += len(_END_MARKER)
+        blocks.append(text[start:end])
+        start = haystack.find(_START_MARKER, end)
+    return tuple(blocks)
 
 
 def _resolve_endpoint(fmt: str) -> str:
@@ -56,99 +104,333 @@ def _resolve_endpoint(fmt: str) -> str:
     return _DEFAULT_PNG_ENDPOINT
 
 
-def _create_client(fmt: str) -> PlantUML:
-    if PlantUML is None:  # pragma: no cover - optional dependency
-        raise ImportError(
-            "The 'plantuml' package is required to render diagrams. Install it via pip."
+def _plantuml_encode(code: str) -> str:
+    """Encode a snippet the way the PlantUML server expects it in the URL path."""
+
+    # Strip the zlib header and checksum to get the raw deflate stream PlantUML decodes.
+    compressed = zlib.compress(code.encode("utf-8"))[2:-4]
+    return base64.b64encode(compressed).translate(_BASE64_TO_PLANTUML).decode("ascii")
+
+
+def render_plantuml(code: str, fmt: str = "png", *, download: bool = True) -> PlantUMLDiagram:
+    """Render a single PlantUML snippet and return the diagram result.
+
+    With ``download=False`` only the image and editor URLs are built; ``data`` is left empty
+    and no request reaches the PlantUML server.
+    """
+
+    if not download:
+        image_url, editor_url = _build_diagram_urls(_resolve_endpoint(fmt), code)
+        return PlantUMLDiagram(
+            code=code,
+            data=b"",
+            format=fmt,
+            image_url=image_url,
+            editor_url=editor_url,
         )
-    # LangChain's PlantUML client speaks HTTP; we only swap the base URL by format.
-    endpoint = _resolve_endpoint(fmt)
-    return PlantUML(url=endpoint)
+    return _render_cached(code, fmt)
+
+
+def _cache_key(code: str, fmt: str, endpoint: str) -> bytes:
+    # The endpoint is part of the key so switching PLANTUML_SERVER_URL never serves stale renders.
+    return hashlib.sha256(f"{endpoint}\0{fmt}\0{code}".encode("utf-8")).digest()
+
+
+def set_disk_cache_dir(path: Path | str | None) -> None:
+    """Persist renders under ``path``; ``None`` falls back to ``PLANTUML_CACHE_DIR``."""
+
+    global _DISK_CACHE_DIR
+    _DISK_CACHE_DIR = None if path is None else Path(path).expanduser()
+
+
+def _disk_cache_dir() -> Path | None:
+    if _DISK_CACHE_DIR is not None:
+        return _DISK_CACHE_DIR
+    custom = os.getenv("PLANTUML_CACHE_DIR")
+    if not custom:
+        return None
+    return Path(custom).expanduser()
+
+
+def _read_disk_cache(key: bytes, fmt: str) -> bytes | None:
+    directory = _disk_cache_dir()
+    if directory is None:
+        return None
+    path = directory / f"{key.hex()}.{fmt}"
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    try:
+        # Bump the mtime so pruning evicts the least recently used renders first.
+        os.utime(path)
+    except OSError:  # pragma: no cover - the disk cache is best-effort
+        pass
+    return data
+
+
+def _disk_cache_limit() -> int:
+    custom = os.getenv("PLANTUML_CACHE_MAX_BYTES")
+    if custom:
+        try:
+            return int(custom)
+        except ValueError:
+            pass
+    return _DISK_CACHE_MAX_BYTES
+
+
+def _scan_disk_cache(directory: Path) -> List[tuple[float, int, Path]]:
+    entries = []
+    for path in directory.iterdir():
+        if path.suffix not in {".png", ".svg"}:
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def _prune_disk_cache(directory: Path, limit: int) -> int:
+    """Evict the least recently used renders until the directory fits; return its size."""
+
+    entries = _scan_disk_cache(directory)
+    total = sum(size for _, size, _ in entries)
+    if total <= limit:
+        return total
+    for _, size, path in sorted(entries):
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        if total <= limit:
+            break
+    return total
+
+
+def _track_disk_cache_write(directory: Path, size: int) -> None:
+    # A running total per directory means only writes that cross the cap pay for a scan;
+    # the first write in a process seeds it from disk (including the file just written).
+    limit = _disk_cache_limit()
+    with _DISK_CACHE_LOCK:
+        usage = _DISK_CACHE_USAGE.get(directory)
+        if usage is None:
+            usage = sum(entry[1] for entry in _scan_disk_cache(directory))
+        else:
+            usage += size
+        if usage > limit:
+            usage = _prune_disk_cache(directory, limit)
+        _DISK_CACHE_USAGE[directory] = usage
+
+
+def _write_disk_cache(key: bytes, fmt: str, data: bytes) -> None:
+    directory = _disk_cache_dir()
+    if directory is None:
+        return
+    path = directory / f"{key.hex()}.{fmt}"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write to a uniquely named sibling first so concurrent writers (threads or processes)
+        # never share a temp file and readers never observe a partial one.
+        handle = tempfile.NamedTemporaryFile(
+            dir=directory, prefix=f"{path.name}.", suffix=".tmp", delete=False
+        )
+        tmp_path = Path(handle.name)
+        try:
+            with handle:
+                handle.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        _track_disk_cache_write(directory, len(data))
+    except OSError:  # pragma: no cover - the disk cache is best-effort
+        pass
+
 
+@dataclass
+class _PendingRender:
+    """A snippet that missed every cache and still needs its bytes downloaded."""
 
-def render_plantuml(code: str, fmt: str = "png") -> PlantUMLDiagram:
-    """Render a single PlantUML snippet and return the diagram result."""
+    key: bytes
+    code: str
+    format: str
+    image_url: str
+    editor_url: str | None
+
+    def finish(self, data: bytes, *, persist: bool = True) -> PlantUMLDiagram:
+        if persist:
+            _write_disk_cache(self.key, self.format, data)
+        diagram = PlantUMLDiagram(
+            code=self.code,
+            data=data,
+            format=self.format,
+            image_url=self.image_url,
+            editor_url=self.editor_url,
+        )
+        with _RENDER_CACHE_LOCK:
+            _RENDER_CACHE[self.key] = diagram
+            if len(_RENDER_CACHE) > _RENDER_CACHE_SIZE:
+                _RENDER_CACHE.popitem(last=False)
+        return replace(diagram)
 
-    client = _create_client(fmt)
-    image_url, editor_url = _build_diagram_urls(client, fmt, code)
-    if not image_url:
-        raise PlantUMLRenderingError("Could not create PlantUML image URL.")
 
-    data = _download_diagram(image_url)
-    return PlantUMLDiagram(
+def _begin_render(code: str, fmt: str) -> PlantUMLDiagram | _PendingRender:
+    endpoint = _resolve_endpoint(fmt)
+    key = _cache_key(code, fmt, endpoint)
+    with _RENDER_CACHE_LOCK:
+        cached = _RENDER_CACHE.get(key)
+        if cached is not None:
+            _RENDER_CACHE.move_to_end(key)
+    if cached is not None:
+        # Hand out copies so callers mutating a result cannot poison the cache.
+        return replace(cached)
+
+    image_url, editor_url = _build_diagram_urls(endpoint, code)
+    pending = _PendingRender(
+        key=key,
         code=code,
-        data=data,
         format=fmt,
         image_url=image_url,
         editor_url=editor_url,
     )
+    data = _read_disk_cache(key, fmt)
+    if data is not None:
+        return pending.finish(data, persist=False)
+    return pending
 
 
-def _build_diagram_urls(client: PlantUML, fmt: str, code: str) -> tuple[str | None, str | None]:
-    try:
-        image_url = client.get_url(code)
-    except AttributeError:  # pragma: no cover - fallback when method missing
-        image_url = None
-    except Exception:  # pragma: no cover - defensive
-        image_url = None
+def _finish_download(pending: _PendingRender) -> PlantUMLDiagram:
+    return pending.finish(_download_diagram(pending.image_url))
+
+
+def _render_cached(code: str, fmt: str) -> PlantUMLDiagram:
+    result = _begin_render(code, fmt)
+    if isinstance(result, _PendingRender):
+        return _finish_download(result)
+    return result
+
+
+def _build_diagram_urls(endpoint: str, code: str) -> tuple[str, str | None]:
+    image_url = endpoint + _plantuml_encode(code)
 
     editor_url: str | None = None
-    if image_url:
-        try:
-            from urllib.parse import urlparse, urlunparse
-
-            # PlantUML encodes the same diagram in different paths for image/editor views.
-            parsed = urlparse(image_url)
-            path = parsed.path
-            if "/png/" in path:
-                editor_path = path.replace("/png/", "/uml/", 1)
-            elif "/svg/" in path:
-                editor_path = path.replace("/svg/", "/uml/", 1)
-            else:
-                editor_path = path
-            editor_url = urlunparse(parsed._replace(path=editor_path))
-        except Exception:  # pragma: no cover - best-effort
-            editor_url = None
+    try:
+        from urllib.parse import urlparse, urlunparse
+
+        # PlantUML encodes the same diagram in different paths for image/editor views.
+        parsed = urlparse(image_url)
+        path = parsed.path
+        if "/png/" in path:
+            editor_path = path.replace("/png/", "/uml/", 1)
+        elif "/svg/" in path:
+            editor_path = path.replace("/svg/", "/uml/", 1)
+        else:
+            editor_path = path
+        editor_url = urlunparse(parsed._replace(path=editor_path))
+    except Exception:  # pragma: no cover - best-effort
+        editor_url = None
 
     return image_url, editor_url
 
 
+def _create_session() -> requests.Session:
+    # Every render hits the same PlantUML host, so one pooled session reuses the TLS handshake.
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_SESSION = _create_session()
+
+
 def _download_diagram(url: str) -> bytes:
     try:
-        response = requests.get(url, timeout=15)
+        response = _SESSION.get(url, timeout=_DOWNLOAD_TIMEOUT)
         response.raise_for_status()
     except RequestException as exc:  # pragma: no cover - network errors
         raise PlantUMLRenderingError(f"Failed to download diagram: {exc}") from exc
     return response.content
 
 
-def render_plantuml_from_text(text: str, fmt: str = "png") -> List[PlantUMLDiagram]:
+def render_plantuml_blocks(
+    blocks: Iterable[str], fmt: str = "png", *, download: bool = True
+) -> List[PlantUMLDiagram]:
+    """Render already-extracted PlantUML snippets, downloading cache misses concurrently."""
+
+    # Identical snippets collapse to a single render.
+    blocks = list(dict.fromkeys(blocks))
+    if not download or len(blocks) < 2:
+        return [render_plantuml(block, fmt=fmt, download=download) for block in blocks]
+
+    # Memory and disk hits resolve here; only misses need a blocking server round-trip.
+    results = [_begin_render(block, fmt) for block in blocks]
+    pending = [result for result in results if isinstance(result, _PendingRender)]
+    if len(pending) > 1:
+        # map() keeps input order and re-raises the first failure (rendering or network)
+        # so callers can decide whether to continue.
+        with ThreadPoolExecutor(max_workers=min(_MAX_IO_WORKERS, len(pending))) as executor:
+            finished = list(executor.map(_finish_download, pending))
+    else:
+        finished = [_finish_download(item) for item in pending]
+
+    downloaded = iter(finished)
+    return [
+        next(downloaded) if isinstance(result, _PendingRender) else result for result in results
+    ]
+
+
+def render_plantuml_from_text(
+    text: str, fmt: str = "png", *, download: bool = True
+) -> List[PlantUMLDiagram]:
     """Extract PlantUML snippets from text and render them."""
 
-    blocks = extract_plantuml_blocks(text)
-    diagrams: List[PlantUMLDiagram] = []
-    for block in blocks:
-        try:
-            diagrams.append(render_plantuml(block, fmt=fmt))
-        except PlantUMLRenderingError:
-            raise
-        # Allow other exceptions (e.g., network) to bubble so callers can decide whether to continue.
-    return diagrams
+    return render_plantuml_blocks(_extract_blocks(text), fmt=fmt, download=download)
+
+
+async def render_plantuml_from_text_async(text: str, fmt: str = "png") -> List[PlantUMLDiagram]:
+    """Awaitable :func:`render_plantuml_from_text` for callers already inside an event loop."""
+
+    # Runs the pooled, retrying session path on a worker thread so the loop stays free.
+    return await asyncio.to_thread(render_plantuml_from_text, text, fmt)
+
+
+def render_plantuml_from_text_concurrent(text: str, fmt: str = "png") -> List[PlantUMLDiagram]:
+    """Alias of :func:`render_plantuml_from_text`, which already downloads misses concurrently."""
+
+    return render_plantuml_from_text(text, fmt=fmt)
+
+
+def _write_file(path: str, data: bytes) -> None:
+    with open(path, "wb") as handle:
+        handle.write(data)
 
 
 def save_diagrams(diagrams: Iterable[PlantUMLDiagram], directory: Path) -> List[Path]:
     """Persist rendered diagrams to disk and return the file paths."""
 
-    saved_paths: List[Path] = []
+    pending = list(diagrams)
     directory.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    for index, diagram in enumerate(diagrams, start=1):
-        filename = f"diagram_{timestamp}_{uuid4().hex[:8]}_{index}.{diagram.format}"
-        path = directory / filename
-        path.write_bytes(diagram.data)
-        saved_paths.append(path)
-    # Return order matches the input iterator so callers can zip results deterministically.
-    return saved_paths
+    dir_str = str(directory)
+    # Names are fixed up front so the returned paths match the input order even though
+    # the writes below complete in any order.
+    filenames = [
+        os.path.join(dir_str, f"diagram_{timestamp}_{secrets.token_hex(4)}_{index}.{diagram.format}")
+        for index, diagram in enumerate(pending, start=1)
+    ]
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(_MAX_IO_WORKERS, len(pending))) as executor:
+            list(executor.map(_write_file, filenames, [diagram.data for diagram in pending]))
+    return [Path(filename) for filename in filenames]
 
 
 __all__ = [
@@ -156,6 +438,10 @@ __all__ = [
     "PlantUMLRenderingError",
     "extract_plantuml_blocks",
     "render_plantuml",
+    "render_plantuml_blocks",
     "render_plantuml_from_text",
+    "render_plantuml_from_text_async",
+    "render_plantuml_from_text_concurrent",
     "save_diagrams",
+    "set_disk_cache_dir",
 ]
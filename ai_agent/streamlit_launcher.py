@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import os
 import subprocess
 import sys
 from pathlib import Path
 from typing import Sequence
 
+# Replacing this process saves a second interpreter; Windows has no real exec, so it keeps
+# waiting on a child.
+_USE_EXEC = os.name == "posix"
+
 
 def main(argv: Sequence[str] | None = None) -> int:
     """Invoke `streamlit run streamlit_app.py` with optional passthrough args."""
@@ -17,6 +22,8 @@ def main(argv: Sequence[str] | None = None) -> int:
     if argv:
         cmd.extend(argv)
     try:
+        if _USE_EXEC:
+            os.execvp(cmd[0], cmd)
         return subprocess.call(cmd)
     except FileNotFoundError as exc:  # streamlit CLI missing
         print(f"Failed to invoke Streamlit: {exc}", file=sys.stderr)
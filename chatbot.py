@@ -5,7 +5,7 @@ from __future__ import annotations
 import argparse
 import sys
 from pathlib import Path
-from typing import Sequence
+from typing import Iterable, Iterator, Sequence
 
 from ai_agent import (
     ConversationMemory,
@@ -90,9 +90,14 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
     parser.add_argument(
         "--diagram-format",
         choices=("png", "svg"),
-        default="png",
+        default="svg",
         help="Image format to request from the PlantUML server.",
     )
+    parser.add_argument(
+        "--links-only",
+        action="store_true",
+        help="Print diagram links without downloading or saving the images.",
+    )
     return parser.parse_args(argv)
 
 
@@ -119,7 +124,21 @@ def build_agent(args: argparse.Namespace) -> GroqConversationAgent:
     return agent
 
 
-def chat_loop(agent: GroqConversationAgent, *, diagram_dir: Path, diagram_format: str) -> list[str]:
+def _echo(tokens: Iterable[str]) -> Iterator[str]:
+    # Print tokens as they arrive so the first words show up before the reply is complete.
+    for token in tokens:
+        sys.stdout.write(token)
+        sys.stdout.flush()
+        yield token
+
+
+def chat_loop(
+    agent: GroqConversationAgent,
+    *,
+    diagram_dir: Path,
+    diagram_format: str,
+    save_images: bool = True,
+) -> list[str]:
     print("Type '/exit' to leave, '/reset' to clear memory, '/note <text>' to add a system note,")
     print("or '/format <text>' to update output instructions on the fly.")
 
@@ -156,18 +175,20 @@ def chat_loop(agent: GroqConversationAgent, *, diagram_dir: Path, diagram_format
         if not command:
             continue
 
+        print("Agent > ", end="", flush=True)
         try:
-            response = agent.respond(command)
+            response = "".join(_echo(agent.respond_stream(command)))
         except Exception as exc:  # noqa: BLE001
-            print(f"Error: {exc}")
+            print(f"\nError: {exc}")
             break
+        print()
 
         transcript.append(f"user: {command}")
         transcript.append(f"assistant: {response}")
-        print(f"Agent > {response}")
 
         try:
-            diagrams = render_plantuml_from_text(response, fmt=diagram_format)
+            # Links are encoded locally, so only download the images when they will be saved.
+            diagrams = render_plantuml_from_text(response, fmt=diagram_format, download=save_images)
         except (ImportError, PlantUMLRenderingError) as exc:
             print(f"Diagram rendering skipped: {exc}", file=sys.stderr)
             diagrams = []
@@ -181,7 +202,7 @@ def chat_loop(agent: GroqConversationAgent, *, diagram_dir: Path, diagram_format
                 print(f"Diagram editor URL: {diagram.editor_url}")
                 transcript.append(f"diagram_editor_url: {diagram.editor_url}")
 
-        if diagrams:
+        if diagrams and save_images:
             try:
                 paths = save_diagrams(diagrams, diagram_dir)
             except Exception as exc:  # noqa: BLE001
@@ -217,7 +238,12 @@ def main(argv: Sequence[str] | None = None) -> int:
         print(exc, file=sys.stderr)
         return 1
 
-    transcript = chat_loop(agent, diagram_dir=args.diagram_dir, diagram_format=args.diagram_format)
+    transcript = chat_loop(
+        agent,
+        diagram_dir=args.diagram_dir,
+        diagram_format=args.diagram_format,
+        save_images=not args.links_only,
+    )
     if args.transcript:
         try:
             save_transcript(args.transcript, transcript)
@@ -3,8 +3,16 @@
 from __future__ import annotations
 
 import os
+import shutil
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, Iterator, Optional
+
+if os.name == "nt":  # pragma: no cover - platform specific
+    import msvcrt
+else:  # pragma: no cover - platform specific
+    import fcntl
 
 try:  # pragma: no cover - optional dependency
     from dotenv import load_dotenv
@@ -14,6 +22,9 @@ except ImportError:  # pragma: no cover - dotenv may be missing in minimal insta
 
 _DEFAULT_FILENAMES: tuple[str, ...] = (".env", ".env.local")
 _ENV_KEY = "GROQ_API_KEY"
+# Agents load the dotenv on every construction; remember what was parsed so repeats are free.
+_LOADED = False
+_LOADED_PATHS: set[str] = set()
 
 
 def _candidate_paths(base_dir: Path | None = None) -> Iterable[Path]:
@@ -26,19 +37,30 @@ def _candidate_paths(base_dir: Path | None = None) -> Iterable[Path]:
 
 
 def load_env(path: Path | str | None = None) -> None:
-    """Load environment variables from a dotenv file if available."""
+    """Load environment variables from a dotenv file if available.
+
+    Each file is parsed at most once per process; later calls are no-ops.
+    """
 
+    global _LOADED
     if load_dotenv is None:
         return
 
     if path is not None:
         path_obj = Path(path)
+        resolved = str(path_obj.resolve())
+        if resolved in _LOADED_PATHS:
+            return
         if path_obj.exists():
             load_dotenv(path_obj, override=False)
+            _LOADED_PATHS.add(resolved)
         return
 
+    if _LOADED:
+        return
     for candidate in _candidate_paths():
         load_dotenv(candidate, override=False)
+        _LOADED = True
         break
 
 
@@ -61,21 +83,66 @@ def prompt_for_key(prompt: str = "Enter GROQ API key (create one for free at htt
         raise RuntimeError("No API key provided.") from exc
 
 
+@contextmanager
+def _locked(target: Path) -> Iterator[None]:
+    # Lock a sidecar file: the dotenv itself is swapped out by os.replace, so its inode is
+    # not a stable thing to lock.
+    with open(target.with_name(f"{target.name}.lock"), "a+b") as handle:
+        if os.name == "nt":  # pragma: no cover - platform specific
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":  # pragma: no cover - platform specific
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def _atomic_write(target: Path, content: str) -> None:
+    handle = tempfile.NamedTemporaryFile(
+        "w",
+        encoding="utf-8",
+        dir=target.parent,
+        prefix=f".{target.name}.",
+        suffix=".tmp",
+        delete=False,
+    )
+    try:
+        # The temp file holds the API key, so a failed write must not leave it behind.
+        with handle:
+            handle.write(content)
+        if target.exists():
+            shutil.copymode(target, handle.name)
+        os.replace(handle.name, target)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+
+
 def save_key(key: str, path: Path | str | None = None) -> None:
     key = key.strip()
     if not key:
         raise ValueError("API key is empty.")
 
     target = Path(path) if path else Path(".env")
-    lines: list[str] = []
-    if target.exists():
-        lines = target.read_text(encoding="utf-8").splitlines()
-        filtered = [line for line in lines if not line.startswith(f"{_ENV_KEY}=")]
-    else:
-        filtered = []
-    # Keep the most recent key while preserving unrelated dotenv content.
-    filtered.append(f"{_ENV_KEY}={key}")
-    target.write_text("\n".join(filtered) + "\n", encoding="utf-8")
+    prefix = f"{_ENV_KEY}="
+    with _locked(target):
+        lines: list[str] = []
+        if target.exists():
+            lines = target.read_text(encoding="utf-8").splitlines()
+        stored = [line[len(prefix) :] for line in lines if line.startswith(prefix)]
+        if stored and stored[-1] == key:
+            # The file already holds this key; skip the rewrite entirely.
+            return
+        filtered = [line for line in lines if not line.startswith(prefix)]
+        # Keep the most recent key while preserving unrelated dotenv content.
+        filtered.append(f"{prefix}{key}")
+        _atomic_write(target, "\n".join(filtered) + "\n")
 
 
 def ensure_api_key(path: Path | str | None = None) -> str:
@@ -0,0 +1,387 @@
+"""Streamlit interface for the Groq-backed diagram agent.
+
+Kept separate from `streamlit_app.py` so the entry script Streamlit re-executes on
+every interaction stays tiny; this module is imported (and compiled) once.
+"""
+
+from __future__ import annotations
+
+import base64
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, List
+
+import streamlit as st
+
+from ai_agent import (
+    ConversationMemory,
+    DEFAULT_GROQ_MODEL,
+    GROQ_TEXT_MODELS,
+    GroqConfig,
+    GroqConversationAgent,
+    build_groq_client,
+)
+from chatkey import get_groq_api_key, save_key
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+
+    from ai_agent import PlantUMLDiagram
+
+_GROQ_MODEL_OPTIONS: tuple[str, ...] = tuple(GROQ_TEXT_MODELS)
+_DEFAULT_GROQ_MODEL_INDEX: int = _GROQ_MODEL_OPTIONS.index(DEFAULT_GROQ_MODEL)
+_DIAGRAM_FORMATS: tuple[str, ...] = ("png", "svg")
+
+_DEFAULT_SYSTEM_PROMPT = (
+    "Role: You are an expert system designer who creates and edits UML diagrams from"
+    " user-provided text or existing PlantUML. Communicate in simple, clear language"
+    " matching the user's language."
+)
+_DEFAULT_OUTPUT_FORMAT = (
+    "Output Format:\n"
+    "- Analysis (concise):\n"
+    "  - Facts extracted (bullets)\n"
+    "  - Assumptions (bullets, only if any)\n"
+    "- PlantUML:\n"
+    "  @startuml\n"
+    "  ...valid PlantUML for the chosen diagram type...\n"
+    "  @enduml\n"
+    "- Summary: 3–6 sentences in the user's language, simple and friendly.\n"
+    "- Follow-up (only if needed): 1–2 short, specific questions to resolve remaining ambiguity."
+)
+
+
+@st.cache_resource(max_entries=8)
+def _cached_groq_client(model: str, temperature: float, max_tokens: int | None) -> ChatGroq:
+    # One client per model configuration, shared across reruns and sessions so its HTTP
+    # connection pool survives agent rebuilds. Conversation memory stays per session.
+    return build_groq_client(GroqConfig(model=model, temperature=temperature, max_tokens=max_tokens))
+
+
+def build_agent(
+    *,
+    model: str,
+    temperature: float,
+    max_tokens: int | None,
+    memory_limit: int | None,
+    system_prompt: str | None,
+    output_format: str | None,
+) -> GroqConversationAgent:
+    memory = ConversationMemory(max_messages=memory_limit)
+    config = GroqConfig(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
+    agent = GroqConversationAgent(
+        memory=memory,
+        system_prompt=system_prompt,
+        output_instructions=output_format,
+        config=config,
+        client=_cached_groq_client(model, temperature, max_tokens),
+    )
+    return agent
+
+
+def settings_digest(settings: dict[str, object]) -> bytes:
+    """Return a short, order-independent digest identifying an agent configuration."""
+
+    payload = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def agent_from_state(settings: dict[str, object]) -> GroqConversationAgent:
+    # Compare 16-byte digests instead of re-checking the long prompt strings every rerun.
+    key = settings_digest(settings)
+    if st.session_state.get("agent_key") != key:
+        # Rebuild the agent whenever the configuration changes, keeping previous chats otherwise.
+        st.session_state.agent = build_agent(
+            model=settings["model"],
+            temperature=settings["temperature"],
+            max_tokens=settings["max_tokens"],
+            memory_limit=settings["memory_limit"],
+            system_prompt=settings["system_prompt"],
+            output_format=settings["output_format"],
+        )
+        st.session_state.agent_key = key
+        st.session_state["diagram_records"] = []
+        st.session_state.pop("diagram_keys", None)
+        st.session_state.pop("diagram_index", None)
+    return st.session_state.agent
+
+
+@functools.cache
+def _plantuml_api() -> ModuleType:
+    # Imported on first render only; chat-only sessions never load the rendering stack.
+    from ai_agent import plantuml_utils
+
+    if not os.getenv("PLANTUML_CACHE_DIR"):
+        # Let renders survive restarts unless the user already chose a cache location.
+        cache_home = Path(os.getenv("XDG_CACHE_HOME") or "~/.cache").expanduser()
+        plantuml_utils.set_disk_cache_dir(cache_home / "text-to-diagram")
+    return plantuml_utils
+
+
+_RENDERED_LIMIT = 256
+# (code, fmt) pairs `_cached_render` has computed, mirroring its st.cache_data entries so
+# only snippets Streamlit has not cached yet are fetched up front.
+_RENDERED: OrderedDict[tuple[str, str], None] = OrderedDict()
+_RENDERED_LOCK = threading.Lock()
+
+
+@st.cache_data(show_spinner=False, max_entries=_RENDERED_LIMIT)
+def _cached_render(code: str, fmt: str) -> PlantUMLDiagram:
+    diagram = _plantuml_api().render_plantuml(code, fmt=fmt)
+    with _RENDERED_LOCK:
+        _RENDERED[(code, fmt)] = None
+        if len(_RENDERED) > _RENDERED_LIMIT:
+            _RENDERED.popitem(last=False)
+    return diagram
+
+
+def cached_render_from_text(text: str, fmt: str) -> List[PlantUMLDiagram]:
+    """Render every PlantUML snippet in `text`, serving repeats from Streamlit's cache."""
+
+    plantuml = _plantuml_api()
+    blocks = list(dict.fromkeys(plantuml.extract_plantuml_blocks(text)))
+    with _RENDERED_LOCK:
+        misses = [block for block in blocks if (block, fmt) not in _RENDERED]
+    if len(misses) > 1:
+        # Fetch the new snippets concurrently into the core render cache; the per-block
+        # calls below then resolve from memory instead of downloading one by one.
+        plantuml.render_plantuml_blocks(misses, fmt=fmt)
+    return [_cached_render(block, fmt) for block in blocks]
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _diagram_data_url(code: str, _data: bytes) -> str:
+    # Keyed on the PlantUML source; the leading underscore keeps the bytes out of the hash.
+    return "data:image/svg+xml;base64," + base64.b64encode(_data).decode("ascii")
+
+
+def display_diagram(diagram: PlantUMLDiagram, *, show_code: bool) -> None:
+    if show_code:
+        st.code(diagram.code, language="text")
+    if diagram.data and diagram.format == "svg":
+        # st.image cannot decode SVG bytes; build the inline data URL once per snippet.
+        source = _diagram_data_url(diagram.code, diagram.data)
+    elif diagram.data:
+        # Raster bytes land in Streamlit's media store and reach the browser as a cacheable
+        # /media URL, so reruns do not resend them over the websocket.
+        source = diagram.data
+    else:
+        source = diagram.image_url
+    st.image(source, caption=f"Generated diagram ({diagram.format})")
+
+    links: List[str] = []
+    if diagram.image_url:
+        links.append(f"[View image]({diagram.image_url})")
+    if diagram.editor_url:
+        links.append(f"[Open in PlantUML editor]({diagram.editor_url})")
+    if links:
+        st.markdown(" · ".join(links))
+
+
+def diagram_keys(records: List[dict[str, object]]) -> set[tuple[int, str]]:
+    """Return the `(message_index, code)` pairs already recorded, rebuilding them if needed."""
+
+    keys = st.session_state.get("diagram_keys")
+    if keys is None:
+        keys = {
+            (record["message_index"], record["diagram"].code)
+            for record in records
+            if record.get("diagram") is not None
+        }
+        st.session_state["diagram_keys"] = keys
+    return keys
+
+
+def diagram_index(records: List[dict[str, object]]) -> dict[object, List[dict[str, object]]]:
+    """Return records bucketed by message index, rebuilding the buckets if needed."""
+
+    by_index = st.session_state.get("diagram_index")
+    if by_index is None:
+        by_index = {}
+        for record in records:
+            by_index.setdefault(record.get("message_index"), []).append(record)
+        st.session_state["diagram_index"] = by_index
+    return by_index
+
+
+def display_history(agent: GroqConversationAgent) -> None:
+    diagram_records = st.session_state.setdefault("diagram_records", [])
+    # Buckets persist across reruns, so each assistant message only visits its own diagrams.
+    records_by_index = diagram_index(diagram_records)
+    for index, message in enumerate(agent.memory.history()):
+        role = message.role
+        content = message.content
+        if role not in {"user", "assistant", "system"}:
+            role = "assistant"
+        with st.chat_message(role):
+            st.markdown(content)
+            if role == "assistant":
+                for record in records_by_index.get(index, ()):
+                    diagram = record.get("diagram")
+                    if diagram is None:
+                        continue
+                    show_code = record.get("show_code")
+                    if show_code is None:
+                        show_code = diagram.code not in content
+                    display_diagram(diagram, show_code=show_code)
+
+@st.cache_resource(show_spinner=False)
+def _load_api_key() -> str | None:
+    # Process-wide: once a key is found, later reruns and sessions skip the .env/env probe.
+    key = get_groq_api_key(required=False)
+    if key:
+        os.environ["GROQ_API_KEY"] = key
+    return key
+
+
+def require_groq_api_key() -> None:
+    """Ensure a Groq API key is available, prompting via the UI when absent."""
+
+    if _load_api_key():
+        return
+
+    # Stop rendering the rest of the UI until the user provides credentials.
+    st.info("Add your Groq API key to start chatting.")
+    with st.form("groq-api-key-form", clear_on_submit=True):
+        key_input = st.text_input(
+            "GROQ_API_KEY",
+            type="password",
+            help="Create a key at https://console.groq.com/keys and paste it here.",
+        )
+        submitted = st.form_submit_button("Save key")
+
+    if submitted:
+        if key_input:
+            save_key(key_input)
+            os.environ["GROQ_API_KEY"] = key_input.strip()
+            _load_api_key.clear()
+            st.rerun()
+        else:
+            st.error("API key cannot be empty.")
+
+    st.stop()
+
+
+@st.fragment
+def chat_fragment(agent: GroqConversationAgent, diagram_format: str) -> None:
+    """Render the conversation and handle new prompts without rerunning the whole page."""
+
+    display_history(agent)
+
+    prompt = st.chat_input("Describe the diagram you need...")
+    if prompt:
+        with st.chat_message("user"):
+            st.markdown(prompt)
+        assistant = st.chat_message("assistant")
+        try:
+            # Tokens render as they arrive; write_stream hands back the joined reply.
+            with assistant:
+                response = st.write_stream(agent.respond_stream(prompt))
+        except Exception as exc:  # pragma: no cover - network/API errors
+            st.error(f"Failed to contact Groq: {exc}")
+            return
+
+        plantuml = _plantuml_api()
+        with assistant:
+            try:
+                diagrams = cached_render_from_text(response, fmt=diagram_format)
+            except plantuml.PlantUMLRenderingError as exc:
+                st.warning(f"PlantUML rendering failed: {exc}")
+                diagrams = []
+            records = st.session_state.setdefault("diagram_records", [])
+            keys = diagram_keys(records)
+            by_index = diagram_index(records)
+            message_index = agent.memory.latest_index
+            for diagram in diagrams:
+                key = (message_index, diagram.code)
+                if key in keys:
+                    continue
+                record = {
+                    "message_index": message_index,
+                    "diagram": diagram,
+                    # Skip reprinting the PlantUML if it already appears in the reply;
+                    # decided once here instead of on every rerun.
+                    "show_code": diagram.code not in response,
+                }
+                records.append(record)
+                by_index.setdefault(message_index, []).append(record)
+                keys.add(key)
+                # Draw into the open reply; the next natural rerun replays it from history.
+                display_diagram(diagram, show_code=record["show_code"])
+
+
+def main() -> None:
+    st.set_page_config(page_title="My Diagram Agent", layout="wide")
+    st.title("My Diagram Agent")
+    st.caption("Chat with a Groq model that remembers context and crafts PlantUML output.")
+
+    require_groq_api_key()
+
+    with st.sidebar:
+        st.header("Session Settings")
+        model = st.selectbox(
+            "Groq model",
+            options=_GROQ_MODEL_OPTIONS,
+            index=_DEFAULT_GROQ_MODEL_INDEX,
+        )
+        temperature = st.slider("Temperature", min_value=0.0, max_value=1.0, value=0.2, step=0.05)
+        max_tokens = st.number_input(
+            "Max tokens (0 = default)",
+            min_value=0,
+            value=0,
+            step=50,
+            help="Limit the size of responses. Leave at 0 to use the model default.",
+        )
+        memory_limit_val = st.number_input(
+            "Memory window (0 = unlimited)",
+            min_value=0,
+            value=30,
+            step=5,
+            help="Number of recent messages to keep in context.",
+        )
+        memory_limit = None if memory_limit_val == 0 else int(memory_limit_val)
+
+        system_prompt = st.text_area(
+            "System prompt",
+            value=_DEFAULT_SYSTEM_PROMPT,
+            height=120,
+        )
+        output_format = st.text_area(
+            "Output instructions",
+            value=_DEFAULT_OUTPUT_FORMAT,
+            height=160,
+        )
+        diagram_format = st.selectbox(
+            "Diagram format",
+            options=_DIAGRAM_FORMATS,
+            index=0,
+        )
+        if st.button("Reset conversation", use_container_width=True):
+            st.session_state.pop("agent", None)
+            st.session_state.pop("agent_key", None)
+            st.session_state.pop("diagram_records", None)
+            st.session_state.pop("diagram_keys", None)
+            st.session_state.pop("diagram_index", None)
+            st.rerun()
+
+    settings = {
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": None if max_tokens == 0 else int(max_tokens),
+        "memory_limit": memory_limit,
+        "system_prompt": system_prompt.strip() or None,
+        "output_format": output_format.strip() or None,
+    }
+
+    agent = agent_from_state(settings)
+    chat_fragment(agent, diagram_format)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+
+from ai_agent import GroqConfig, GroqConversationAgent
+
+
+class FakeClient:
+    def __init__(self, reply: str = "hello") -> None:
+        self.reply = reply
+        self.prompts: list[list[object]] = []
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        for word in self.reply.split(" "):
+            yield type("Chunk", (), {"content": word + " "})()
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        await asyncio.sleep(0)
+        return type("Reply", (), {"content": f"re: {prompt[-1].content}"})()
+
+
+def test_update_output_instructions_refreshes_system_message():
+    client = FakeClient()
+    agent = GroqConversationAgent(system_prompt="Persona", output_instructions="Terse", client=client)
+
+    agent.respond("first")
+    agent.update_output_instructions("Verbose")
+    agent.respond("second")
+
+    first_system, second_system = (prompt[0].content for prompt in client.prompts)
+    assert first_system == "Persona\n\nOutput requirements:\nTerse"
+    assert second_system == "Persona\n\nOutput requirements:\nVerbose"
+
+
+def test_assigning_system_prompt_refreshes_system_message():
+    client = FakeClient()
+    agent = GroqConversationAgent(system_prompt="Old", output_instructions="Terse", client=client)
+
+    agent.respond("first")
+    agent.system_prompt = "New"
+    agent.respond("second")
+
+    assert [prompt[0].content.split("\n")[0] for prompt in client.prompts] == ["Old", "New"]
+
+
+def test_respond_stream_yields_chunks_and_records_full_reply():
+    agent = GroqConversationAgent(client=FakeClient("draw a class"))
+
+    chunks = list(agent.respond_stream("  hi  "))
+
+    assert chunks == ["draw ", "a ", "class "]
+    assert [(message.role, message.content) for message in agent.memory.history()] == [
+        ("user", "hi"),
+        ("assistant", "draw a class"),
+    ]
+
+
+def test_respond_many_answers_each_prompt_without_touching_memory():
+    client = FakeClient()
+    agent = GroqConversationAgent(client=client)
+    agent.memory.add_user_message("earlier")
+
+    replies = asyncio.run(agent.respond_many(["one", "two"], max_concurrency=1))
+
+    assert replies == ["re: one", "re: two"]
+    assert [[message.content for message in prompt[1:]] for prompt in client.prompts] == [
+        ["earlier", "one"],
+        ["earlier", "two"],
+    ]
+    assert [message.content for message in agent.memory.history()] == ["earlier"]
+
+
+def test_system_message_is_reused_between_turns():
+    client = FakeClient()
+    agent = GroqConversationAgent(client=client)
+
+    agent.respond("first")
+    agent.respond("second")
+
+    assert client.prompts[0][0] is client.prompts[1][0]
+
+
+def test_cache_deterministic_replays_identical_turns():
+    client = FakeClient("cached answer")
+    agent = GroqConversationAgent(
+        client=client,
+        config=GroqConfig(temperature=0.0, cache_deterministic=True),
+    )
+
+    first = agent.respond("hi")
+    agent.reset()
+    second = agent.respond("hi")
+
+    assert first == second
+    assert len(client.prompts) == 1
+    assert [message.role for message in agent.memory.history()] == ["user", "assistant"]
@@ -34,3 +34,73 @@ def test_main_runs_chat_loop_and_writes_transcript(tmp_path, monkeypatch):
     assert build_agent_calls and build_agent_calls[0] is args
     assert written["path"] == transcript_path
     assert written["transcript"] == ["user: hi", "assistant: hello"]
+
+
+class _StreamingAgent:
+    def __init__(self, stream):
+        self._stream = stream
+
+    def respond_stream(self, prompt: str):
+        return self._stream(prompt)
+
+
+def _feed_input(monkeypatch, *lines: str) -> None:
+    replies = iter(lines)
+    monkeypatch.setattr("builtins.input", lambda _prompt: next(replies))
+
+
+def test_chat_loop_echoes_tokens_as_they_arrive(tmp_path, monkeypatch, capsys):
+    seen_mid_stream = []
+
+    def stream(prompt):
+        yield "Hel"
+        seen_mid_stream.append(capsys.readouterr().out)
+        yield "lo"
+
+    _feed_input(monkeypatch, "hi", "/exit")
+
+    transcript = chatbot.chat_loop(
+        _StreamingAgent(stream), diagram_dir=tmp_path, diagram_format="svg"
+    )
+
+    assert seen_mid_stream[0].endswith("Agent > Hel")
+    assert capsys.readouterr().out.startswith("lo\n")
+    assert transcript == ["user: hi", "assistant: Hello"]
+
+
+def test_chat_loop_reports_errors_raised_mid_stream(tmp_path, monkeypatch, capsys):
+    def stream(prompt):
+        yield "Par"
+        raise RuntimeError("connection dropped")
+
+    _feed_input(monkeypatch, "hi")
+
+    transcript = chatbot.chat_loop(
+        _StreamingAgent(stream), diagram_dir=tmp_path, diagram_format="svg"
+    )
+
+    assert "Agent > Par\nError: connection dropped" in capsys.readouterr().out
+    assert transcript == []
+
+
+def test_parse_args_requests_svg_diagrams_by_default():
+    assert chatbot.parse_args([]).diagram_format == "svg"
+
+
+def test_chat_loop_links_only_never_downloads_or_saves(tmp_path, monkeypatch, mocker, capsys):
+    download = mocker.patch("ai_agent.plantuml_utils._download_diagram")
+    save = mocker.patch("chatbot.save_diagrams")
+    reply = "@startuml\nAlice -> Bob : Hi\n@enduml"
+    _feed_input(monkeypatch, "draw", "/exit")
+
+    transcript = chatbot.chat_loop(
+        _StreamingAgent(lambda prompt: iter([reply])),
+        diagram_dir=tmp_path,
+        diagram_format="svg",
+        save_images=False,
+    )
+
+    download.assert_not_called()
+    save.assert_not_called()
+    assert any(line.startswith("diagram_image_url: ") for line in transcript)
+    assert "Diagram image URL: " in capsys.readouterr().out
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import pytest
+
+import chatkey
+
+
+def test_save_key_replaces_key_and_keeps_other_entries(tmp_path):
+    env_path = tmp_path / ".env"
+    env_path.write_text("OTHER=1\nGROQ_API_KEY=old\n", encoding="utf-8")
+
+    chatkey.save_key("  new  ", env_path)
+
+    assert env_path.read_text(encoding="utf-8") == "OTHER=1\nGROQ_API_KEY=new\n"
+
+
+def test_save_key_skips_rewrite_when_key_is_unchanged(tmp_path, monkeypatch):
+    env_path = tmp_path / ".env"
+    env_path.write_text("GROQ_API_KEY=same\n", encoding="utf-8")
+    writes = []
+    monkeypatch.setattr(chatkey, "_atomic_write", lambda *args: writes.append(args))
+
+    chatkey.save_key("same", env_path)
+
+    assert writes == []
+
+
+def test_load_env_parses_each_file_once(tmp_path, monkeypatch):
+    env_path = tmp_path / ".env"
+    env_path.write_text("GROQ_API_KEY=abc\n", encoding="utf-8")
+    calls = []
+    monkeypatch.setattr(chatkey, "load_dotenv", lambda path, override: calls.append(path))
+    monkeypatch.setattr(chatkey, "_LOADED_PATHS", set())
+
+    chatkey.load_env(env_path)
+    chatkey.load_env(str(env_path))
+
+    assert calls == [env_path]
+
+
+def test_atomic_write_removes_temp_file_when_write_fails(tmp_path):
+    target = tmp_path / ".env"
+
+    # A lone surrogate cannot be encoded as UTF-8, so the write itself fails.
+    with pytest.raises(UnicodeEncodeError):
+        chatkey._atomic_write(target, "GROQ_API_KEY=\ud800\n")
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from ai_agent import ConversationMemory, Message
+
+
+def test_as_langchain_tracks_trimmed_history():
+    memory = ConversationMemory(max_messages=2)
+    memory.add_system_message("Be brief")
+    memory.add_user_message("  hi  ")
+    memory.add_ai_message("hello")
+
+    converted = memory.as_langchain()
+
+    assert [type(message) for message in converted] == [HumanMessage, AIMessage]
+    assert [message.content for message in converted] == ["hi", "hello"]
+
+
+def test_as_langchain_skips_unknown_roles_and_follows_load_history():
+    memory = ConversationMemory()
+    memory.add("tool", "ignored")
+    memory.add_system_message("note")
+    assert [type(message) for message in memory.as_langchain()] == [SystemMessage]
+
+    memory.load_history(memory.history()[:1])
+    assert memory.as_langchain() == []
+
+
+def test_history_keeps_most_recent_messages_within_limit():
+    memory = ConversationMemory(max_messages=3)
+    for index in range(5):
+        memory.add_user_message(f"message {index}")
+
+    assert [message.content for message in memory.history()] == ["message 2", "message 3", "message 4"]
+
+    memory.load_history(memory.history() * 2)
+    assert len(memory.history()) == 3
+
+
+def test_messages_are_slotted_and_hashable():
+    message = Message(role="user", content="hi")
+
+    assert not hasattr(message, "__dict__")
+    assert hash(message) == hash(Message(role="user", content="hi"))
+
+
+def test_history_snapshot_is_reused_until_memory_changes():
+    memory = ConversationMemory()
+    assert memory.latest_index == -1
+
+    memory.add_user_message("hi")
+    first = memory.history()
+    assert memory.history() is first
+
+    memory.add_ai_message("hello")
+    assert memory.history() is not first
+    assert len(memory) == 2
+    assert memory.latest_index == 1
+
+    memory.clear()
+    assert memory.history() == ()
+
+
+def test_assigning_max_messages_rebounds_the_history():
+    memory = ConversationMemory(max_messages=2)
+    memory.add_user_message("one")
+    memory.add_ai_message("two")
+    memory.history()
+
+    memory.max_messages = 3
+    memory.add_user_message("three")
+    assert [message.content for message in memory.history()] == ["one", "two", "three"]
+
+    memory.max_messages = 1
+    assert [message.content for message in memory.history()] == ["three"]
+    assert [message.content for message in memory.as_langchain()] == ["three"]
+
+    memory.max_messages = None
+    for index in range(30):
+        memory.add_user_message(str(index))
+    assert len(memory) == 31
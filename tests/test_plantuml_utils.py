@@ -1,6 +1,32 @@
 from __future__ import annotations
 
-from ai_agent.plantuml_utils import extract_plantuml_blocks, render_plantuml_from_text
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+
+import pytest
+
+from ai_agent import plantuml_utils
+from ai_agent.plantuml_utils import (
+    PlantUMLDiagram,
+    extract_plantuml_blocks,
+    render_plantuml_from_text,
+    save_diagrams,
+)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_caches(monkeypatch):
+    # Every test starts from empty module caches with the disk cache off unless it opts in.
+    monkeypatch.setattr(plantuml_utils, "_RENDER_CACHE", OrderedDict())
+    monkeypatch.setattr(plantuml_utils, "_DISK_CACHE_USAGE", {})
+    monkeypatch.setattr(plantuml_utils, "_DISK_CACHE_DIR", None)
+    monkeypatch.delenv("PLANTUML_CACHE_DIR", raising=False)
+    monkeypatch.delenv("PLANTUML_CACHE_MAX_BYTES", raising=False)
+    plantuml_utils._extract_blocks.cache_clear()
+    yield
+    plantuml_utils._extract_blocks.cache_clear()
 
 
 def test_extract_plantuml_blocks_finds_multiple_snippets():
@@ -40,3 +66,167 @@ def test_render_plantuml_from_text_passes_snippets_through(mocker):
     args, kwargs = render.call_args
     assert args[0].startswith("@startuml")
     assert kwargs["fmt"] == "svg"
+
+
+def test_render_plantuml_from_text_renders_duplicate_snippets_once(mocker):
+    render = mocker.patch("ai_agent.plantuml_utils.render_plantuml", side_effect=lambda code, **_: code)
+    block = "@startuml\nAlice -> Bob : Hi\n@enduml"
+
+    diagrams = render_plantuml_from_text(f"{block}\n\n{block}", fmt="png")
+
+    assert diagrams == [block]
+    render.assert_called_once()
+
+
+def test_render_plantuml_from_text_downloads_misses_concurrently_in_order(mocker):
+    cached, first, second = (f"@startuml\nA -> B : {n}\n@enduml" for n in range(3))
+    mocker.patch("ai_agent.plantuml_utils._download_diagram", return_value=b"cached")
+    plantuml_utils.render_plantuml(cached)
+
+    barrier = threading.Barrier(2, timeout=5)
+    downloaded = []
+
+    def fake_download(url):
+        # Both misses must be in flight at once for the barrier to release.
+        barrier.wait()
+        downloaded.append(url)
+        return url.encode()
+
+    mocker.patch("ai_agent.plantuml_utils._download_diagram", side_effect=fake_download)
+
+    diagrams = render_plantuml_from_text("\n\n".join([first, cached, second]), fmt="png")
+
+    assert [diagram.code for diagram in diagrams] == [first, cached, second]
+    assert diagrams[1].data == b"cached"
+    assert sorted(downloaded) == sorted([diagrams[0].image_url, diagrams[2].image_url])
+
+
+def test_render_plantuml_from_text_skips_the_pool_when_every_block_is_cached(mocker):
+    blocks = ["@startuml\nAlice -> Bob : Hi\n@enduml", "@startuml\nBob -> Carol : Hi!\n@enduml"]
+    mocker.patch("ai_agent.plantuml_utils._download_diagram", return_value=b"png-bytes")
+    for block in blocks:
+        plantuml_utils.render_plantuml(block)
+    pool = mocker.patch("ai_agent.plantuml_utils.ThreadPoolExecutor")
+
+    diagrams = render_plantuml_from_text("\n\n".join(blocks), fmt="png")
+
+    assert [diagram.code for diagram in diagrams] == blocks
+    pool.assert_not_called()
+
+
+def test_render_plantuml_reuses_cached_download(mocker, monkeypatch, tmp_path):
+    monkeypatch.setenv("PLANTUML_CACHE_DIR", str(tmp_path))
+    download = mocker.patch("ai_agent.plantuml_utils._download_diagram", return_value=b"png-bytes")
+    code = "@startuml\nAlice -> Bob : Hi\n@enduml"
+
+    first = plantuml_utils.render_plantuml(code, fmt="png")
+    second = plantuml_utils.render_plantuml(code, fmt="png")
+
+    assert first == second
+    download.assert_called_once()
+    assert [path.read_bytes() for path in tmp_path.iterdir()] == [b"png-bytes"]
+
+    # A cold in-memory cache still avoids the network thanks to the on-disk copy.
+    plantuml_utils._RENDER_CACHE.clear()
+    assert plantuml_utils.render_plantuml(code, fmt="png").data == b"png-bytes"
+    download.assert_called_once()
+
+
+def test_set_disk_cache_dir_takes_precedence_over_the_environment(mocker, monkeypatch, tmp_path):
+    monkeypatch.setenv("PLANTUML_CACHE_DIR", str(tmp_path / "env"))
+    mocker.patch("ai_agent.plantuml_utils._download_diagram", return_value=b"png-bytes")
+
+    plantuml_utils.set_disk_cache_dir(tmp_path / "explicit")
+    plantuml_utils.render_plantuml("@startuml\nAlice -> Bob : Hi\n@enduml", fmt="png")
+
+    assert len(list((tmp_path / "explicit").iterdir())) == 1
+    assert not (tmp_path / "env").exists()
+    plantuml_utils.set_disk_cache_dir(None)
+    assert plantuml_utils._disk_cache_dir() == tmp_path / "env"
+
+
+def test_disk_cache_evicts_least_recently_used_renders(mocker, monkeypatch, tmp_path):
+    monkeypatch.setenv("PLANTUML_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("PLANTUML_CACHE_MAX_BYTES", "8")
+    mocker.patch("ai_agent.plantuml_utils._download_diagram", return_value=b"1234")
+    old, recent, new = (f"@startuml\nA -> B : {n}\n@enduml" for n in range(3))
+
+    endpoint = plantuml_utils._resolve_endpoint("png")
+
+    def cache_file(code):
+        return tmp_path / f"{plantuml_utils._cache_key(code, 'png', endpoint).hex()}.png"
+
+    plantuml_utils.render_plantuml(old)
+    plantuml_utils.render_plantuml(recent)
+    # Make `recent` look older on disk; reading it back through the cache must refresh it.
+    os.utime(cache_file(old), (2, 2))
+    os.utime(cache_file(recent), (1, 1))
+    plantuml_utils._RENDER_CACHE.clear()
+    plantuml_utils.render_plantuml(recent)
+    plantuml_utils.render_plantuml(new)
+
+    assert not cache_file(old).exists()
+    assert cache_file(recent).exists()
+    assert cache_file(new).exists()
+
+
+def test_disk_cache_writes_under_the_cap_skip_the_directory_scan(mocker, monkeypatch, tmp_path):
+    monkeypatch.setenv("PLANTUML_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("PLANTUML_CACHE_MAX_BYTES", "100")
+    mocker.patch("ai_agent.plantuml_utils._download_diagram", return_value=b"1234")
+    scan = mocker.spy(plantuml_utils, "_scan_disk_cache")
+
+    for index in range(3):
+        plantuml_utils.render_plantuml(f"@startuml\nA -> B : {index}\n@enduml")
+
+    # Only the first write seeds the running total from disk.
+    assert scan.call_count == 1
+    assert plantuml_utils._DISK_CACHE_USAGE[tmp_path] == 12
+
+
+def test_render_plantuml_from_text_async_uses_the_pooled_render_path(mocker):
+    render = mocker.patch(
+        "ai_agent.plantuml_utils.render_plantuml_from_text", return_value=["diagram"]
+    )
+
+    diagrams = asyncio.run(plantuml_utils.render_plantuml_from_text_async("text", fmt="svg"))
+
+    assert diagrams == ["diagram"]
+    render.assert_called_once_with("text", "svg")
+
+
+def test_plantuml_encode_matches_reference_encoding():
+    # Reference value from the PlantUML text encoding documentation.
+    assert plantuml_utils._plantuml_encode("Bob -> Alice : hello") == "SyfFKj2rKt3CoKnELR1Io4ZDoSa70000"
+
+
+def test_save_diagrams_returns_paths_in_input_order(tmp_path):
+    diagrams = [
+        PlantUMLDiagram(code="@startuml\nA -> B\n@enduml", data=b"first", format="png"),
+        PlantUMLDiagram(code="@startuml\nB -> C\n@enduml", data=b"second", format="svg"),
+    ]
+
+    paths = save_diagrams(diagrams, tmp_path / "out")
+
+    assert [path.suffix for path in paths] == [".png", ".svg"]
+    assert [path.read_bytes() for path in paths] == [b"first", b"second"]
+
+
+def test_render_plantuml_without_download_skips_network(mocker):
+    download = mocker.patch("ai_agent.plantuml_utils._download_diagram")
+
+    diagram = plantuml_utils.render_plantuml("@startuml\nA -> B\n@enduml", fmt="svg", download=False)
+
+    download.assert_not_called()
+    assert diagram.data == b""
+    assert "/svg/" in diagram.image_url
+    assert "/uml/" in diagram.editor_url
+
+
+def test_extract_plantuml_blocks_returns_fresh_lists_for_cached_text():
+    text = "@startuml\nAlice -> Bob : Hi\n@enduml"
+
+    first = extract_plantuml_blocks(text)
+    first.append("mutated")
+
+    assert extract_plantuml_blocks(text) == [text]
@@ -12,6 +12,7 @@ def test_streamlit_launcher_invokes_streamlit_cli(tmp_path, monkeypatch):
         called["cmd"] = cmd
         return 0
 
+    monkeypatch.setattr(streamlit_launcher, "_USE_EXEC", False)
     monkeypatch.setattr(streamlit_launcher.subprocess, "call", fake_call)
 
     exit_code = streamlit_launcher.main(["--server.headless", "true"])
@@ -26,8 +27,27 @@ def test_streamlit_launcher_handles_keyboard_interrupt(monkeypatch):
     def interrupting_call(cmd):
         raise KeyboardInterrupt
 
+    monkeypatch.setattr(streamlit_launcher, "_USE_EXEC", False)
     monkeypatch.setattr(streamlit_launcher.subprocess, "call", interrupting_call)
 
     exit_code = streamlit_launcher.main([])
 
     assert exit_code == 130
+
+
+def test_streamlit_launcher_replaces_process_on_posix(monkeypatch):
+    executed = {}
+
+    def fake_execvp(file, args):
+        executed["file"] = file
+        executed["args"] = args
+        raise FileNotFoundError(file)
+
+    monkeypatch.setattr(streamlit_launcher, "_USE_EXEC", True)
+    monkeypatch.setattr(streamlit_launcher.os, "execvp", fake_execvp)
+
+    exit_code = streamlit_launcher.main([])
+
+    assert exit_code == 1
+    assert executed["file"] == "streamlit"
+    assert executed["args"][:2] == ["streamlit", "run"]
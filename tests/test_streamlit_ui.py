@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+
+import pytest
+
+import streamlit_ui
+from ai_agent import PlantUMLDiagram, plantuml_utils
+
+
+@pytest.fixture(autouse=True)
+def _fresh_plantuml_api(monkeypatch):
+    # _plantuml_api() points the core disk cache at the user cache dir; keep that per test.
+    monkeypatch.setattr(plantuml_utils, "_DISK_CACHE_DIR", None)
+    streamlit_ui._plantuml_api.cache_clear()
+    yield
+    streamlit_ui._plantuml_api.cache_clear()
+
+
+def test_plantuml_api_defaults_the_disk_cache_to_the_user_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.delenv("PLANTUML_CACHE_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    streamlit_ui._plantuml_api()
+
+    assert plantuml_utils._disk_cache_dir() == tmp_path / "text-to-diagram"
+    assert "PLANTUML_CACHE_DIR" not in os.environ
+
+
+def test_plantuml_api_keeps_an_explicit_plantuml_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("PLANTUML_CACHE_DIR", str(tmp_path))
+
+    streamlit_ui._plantuml_api()
+
+    assert plantuml_utils._disk_cache_dir() == tmp_path
+
+
+def test_display_diagram_hands_png_bytes_to_streamlit(mocker):
+    image = mocker.patch("streamlit_ui.st.image")
+    mocker.patch("streamlit_ui.st.markdown")
+    diagram = PlantUMLDiagram(
+        code="@startuml\nA -> B\n@enduml",
+        data=b"png-bytes",
+        format="png",
+        image_url="https://plantuml.example/png/abc",
+    )
+
+    streamlit_ui.display_diagram(diagram, show_code=False)
+
+    assert image.call_args.args[0] == b"png-bytes"
+
+
+def test_display_diagram_inlines_svg_as_a_data_url(mocker):
+    image = mocker.patch("streamlit_ui.st.image")
+    mocker.patch("streamlit_ui.st.markdown")
+    diagram = PlantUMLDiagram(code="@startuml\nA -> B\n@enduml", data=b"<svg/>", format="svg")
+
+    streamlit_ui.display_diagram(diagram, show_code=False)
+
+    assert image.call_args.args[0] == "data:image/svg+xml;base64,PHN2Zy8+"
+
+
+def test_display_diagram_falls_back_to_the_image_url_without_bytes(mocker):
+    image = mocker.patch("streamlit_ui.st.image")
+    mocker.patch("streamlit_ui.st.markdown")
+    diagram = PlantUMLDiagram(code="@startuml\nA -> B\n@enduml", data=b"", image_url="https://x/png/abc")
+
+    streamlit_ui.display_diagram(diagram, show_code=False)
+
+    assert image.call_args.args[0] == "https://x/png/abc"
+
+
+def test_cached_render_from_text_prefetches_only_uncached_blocks(mocker, monkeypatch):
+    cached, first, second = (f"@startuml\nA -> B : {n}\n@enduml" for n in range(3))
+    monkeypatch.setattr(streamlit_ui, "_RENDERED", OrderedDict({(cached, "png"): None}))
+    prefetch = mocker.patch("ai_agent.plantuml_utils.render_plantuml_blocks")
+    mocker.patch("streamlit_ui._cached_render", side_effect=lambda code, fmt: code)
+
+    diagrams = streamlit_ui.cached_render_from_text("\n".join([cached, first, second]), "png")
+
+    assert diagrams == [cached, first, second]
+    prefetch.assert_called_once_with([first, second], fmt="png")
+
+
+def test_settings_digest_ignores_key_order():
+    settings = {"model": "m", "temperature": 0.2, "system_prompt": None}
+
+    digest = streamlit_ui.settings_digest(settings)
+
+    assert digest == streamlit_ui.settings_digest(dict(reversed(list(settings.items()))))
+    assert len(digest) == 16
+    assert digest != streamlit_ui.settings_digest({**settings, "temperature": 0.3})
+
+
+def test_diagram_keys_rebuilds_from_records_once(mocker):
+    state = {}
+    mocker.patch.object(streamlit_ui.st, "session_state", state)
+    diagram = PlantUMLDiagram(code="@startuml\nA -> B\n@enduml", data=b"x")
+    records = [{"message_index": 1, "diagram": diagram}, {"message_index": 2, "diagram": None}]
+
+    keys = streamlit_ui.diagram_keys(records)
+
+    assert keys == {(1, diagram.code)}
+    assert streamlit_ui.diagram_keys([]) is keys